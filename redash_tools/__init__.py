@@ -1,2 +1,34 @@
-from redash_tools.core.session import RedashSession
-from redash_tools.core.entities import Query, Dashboard, Widget, Visualization, QueryTemplate, DashboardTemplate
+import importlib
+
+# public names are imported lazily on first access (PEP 562), so that importing redash_tools.cli stays fast
+_exports = {
+    'RedashSession': 'redash_tools.core.session',
+    'Query': 'redash_tools.core.entities',
+    'Dashboard': 'redash_tools.core.entities',
+    'Widget': 'redash_tools.core.entities',
+    'Visualization': 'redash_tools.core.entities',
+    'QueryTemplate': 'redash_tools.core.entities',
+    'DashboardTemplate': 'redash_tools.core.entities',
+    'RedashCluster': 'redash_tools.core.cluster',
+    'ClusterResult': 'redash_tools.core.cluster',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name]), name)
+    else:
+        try:
+            value = importlib.import_module(f'{__name__}.{name}')  # submodules, e.g. redash_tools.core
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
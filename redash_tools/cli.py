@@ -0,0 +1,298 @@
+"""
+command-line interface for redash_tools, installed as `rt`
+heavy modules (requests, entities) are imported inside commands, so that `rt --help` starts fast
+credentials (url and API key together) are taken from env REDASH_URL + REDASH_API_KEY
+or from a profile (--profile, env REDASH_PROFILE, default "default") of config file
+(env REDASH_TOOLS_CONFIG, default ~/.redash_tools.ini) with one section per profile:
+
+    [default]
+    url = https://redash.example.com
+    api_key = ...
+"""
+import argparse
+import json
+import os
+import sys
+
+DEFAULT_CONFIG = os.path.join('~', '.redash_tools.ini')
+
+
+def _read_profile(profile):
+    import configparser
+    path = os.path.expanduser(os.environ.get('REDASH_TOOLS_CONFIG', DEFAULT_CONFIG))
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(path, encoding='utf-8')
+    if not config.has_section(profile):
+        return {}
+    return dict(config.items(profile))
+
+
+def _credentials(url=None, profile=None):
+    """
+    returns (url, api_key) taken together from one source:
+    explicitly chosen profile (--profile or REDASH_PROFILE), env REDASH_URL + REDASH_API_KEY or default profile
+    url option overrides url only for key from env or explicitly chosen profile
+    """
+    profile = profile or os.environ.get('REDASH_PROFILE')
+    if profile is None and (os.environ.get('REDASH_URL') or os.environ.get('REDASH_API_KEY')):
+        api_key = os.environ.get('REDASH_API_KEY')
+        if not api_key:
+            raise SystemExit('rt: REDASH_URL задан без REDASH_API_KEY')
+        url = url or os.environ.get('REDASH_URL')
+        if not url:
+            raise SystemExit('rt: REDASH_API_KEY задан без REDASH_URL и --url')
+        return url.strip('/\\ '), api_key
+    if profile is None and url is not None:
+        raise SystemExit('rt: --url требует API-ключ из REDASH_API_KEY или явно выбранного профиля')
+    profile_name = profile or 'default'
+    config = _read_profile(profile_name)
+    url = url or config.get('url')
+    api_key = config.get('api_key')
+    if not url or not api_key:
+        raise SystemExit(f'rt: не заданы url и API-ключ (профиль {profile_name})')
+    return url.strip('/\\ '), api_key
+
+
+def _session(url=None, profile=None):
+    from redash_tools.core.session import RedashSession
+    return RedashSession(*_credentials(url, profile))
+
+
+def _entity_class(entity_type):
+    from redash_tools.core.entities import Query, Dashboard
+    return {'query': Query, 'dashboard': Dashboard}[entity_type]
+
+
+def _write(record, stream=None):
+    stream = stream or sys.stdout
+    stream.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + '\n')
+    stream.flush()
+
+
+def _for_each(items, action, key=None, key_name='id'):
+    """
+    calls action(item) for every item, writes result to stdout and error to stderr as JSON Lines
+    key(item) identifies item in error records
+    returns exit code
+    """
+    exit_code = 0
+    for item in items:
+        entity_id = item if key is None else key(item)
+        try:
+            record = action(item)
+        except Exception as e:
+            _write({key_name: entity_id, 'error': str(e) or repr(e)}, sys.stderr)
+            exit_code = 1
+        else:
+            _write(record if record is not None else {key_name: entity_id, 'ok': True})
+    return exit_code
+
+
+def _open_files(paths):
+    """
+    opens all files up front, so that missing file is reported before any upload
+    returns list of (path, file)
+    """
+    files = []
+    for path in paths or ['-']:
+        if path == '-':
+            files.append((path, sys.stdin))
+            continue
+        try:
+            files.append((path, open(path, 'r', encoding='utf-8')))
+        except OSError as e:
+            raise SystemExit(f'rt: не удалось открыть файл {path}: {e.strerror}')
+    return files
+
+
+def _read_lines(files):
+    """
+    yields (location, line) for non-empty lines, lines are parsed by caller
+    """
+    for path, file in files:
+        try:
+            for line_number, line in enumerate(file, 1):
+                if line.strip():
+                    yield f'{path}:{line_number}', line
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+
+def _parse_entity(line):
+    entity_dict = json.loads(line)
+    if not isinstance(entity_dict, dict):
+        raise ValueError('строка должна содержать JSON-объект')
+    return entity_dict
+
+
+def _parse_condition(condition, regex):
+    """
+    parses key=value (value is string) or key:=json (value is decoded JSON, e.g. id:=5, is_draft:=true)
+    """
+    key, sep, value = condition.partition('=')
+    if not sep:
+        raise SystemExit(f'rt: условие должно иметь вид key=value или key:=json: {condition}')
+    if key.endswith(':'):
+        key = key[:-1]
+        if regex:
+            raise SystemExit(f'rt: условие key:=json несовместимо с --regex: {condition}')
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise SystemExit(f'rt: некорректный JSON в условии: {condition}')
+    return key, value
+
+
+def _source_key(entity_dict):
+    return entity_dict.get('slug', entity_dict.get('id'))
+
+
+def _remote_record(remote_entity, source_key):
+    record = {'source': source_key, 'id': remote_entity.id}
+    if hasattr(remote_entity, 'slug'):
+        record['slug'] = remote_entity.slug
+    return record
+
+
+####################
+# commands section #
+####################
+
+def cmd_export(args):
+    rs = _session(args.url, args.profile)
+    uri = {'query': 'queries', 'dashboard': 'dashboards'}[args.entity_type]
+    return _for_each(args.ids, lambda entity_id: rs.get(f'{uri}/{entity_id}'))
+
+
+def cmd_import(args):
+    files = _open_files(args.files)
+    rs = _session(args.url, args.profile)
+    cls = _entity_class(args.entity_type)
+
+    def upload(item):
+        _, line = item
+        entity_dict = _parse_entity(line)
+        source_key = _source_key(entity_dict)
+        remote_entity = cls.from_dict(entity_dict).to_redash(rs, try_to_update=args.update)
+        return _remote_record(remote_entity, source_key)
+
+    return _for_each(_read_lines(files), upload, key=lambda item: item[0], key_name='line')
+
+
+def cmd_sync(args):
+    source = _session(args.url, args.profile)
+    target = _session(args.target_url, args.target_profile)
+    get = source.get_query if args.entity_type == 'query' else source.get_dashboard
+    return _for_each(args.ids, lambda entity_id: _remote_record(get(entity_id).to_redash(target), entity_id))
+
+
+def cmd_find(args):
+    rs = _session(args.url, args.profile)
+    conditions = dict(_parse_condition(c, args.regex) for c in args.where)
+    for found in rs.find_by_conditions(args.uri, conditions, regex=args.regex, return_slugs=args.slugs):
+        _write({'slug' if args.slugs else 'id': found})
+    return 0
+
+
+def cmd_tag(args):
+    rs = _session(args.url, args.profile)
+    return _for_each(args.ids, lambda query_id: rs.tag_queries([query_id], args.tags))
+
+
+def cmd_schedule(args):
+    rs = _session(args.url, args.profile)
+    return _for_each(args.ids, lambda query_id: rs.schedule_queries([query_id], args.interval))
+
+
+def cmd_archive(args):
+    rs = _session(args.url, args.profile)
+    change = rs.restore_queries if args.restore else rs.archive_queries
+    return _for_each(args.ids, lambda query_id: change([query_id]))
+
+
+def cmd_replace_sql(args):
+    rs = _session(args.url, args.profile)
+    return _for_each(args.ids, lambda query_id: rs.replace_query_sql([query_id], args.str_from, args.str_to,
+                                                                     regex=args.regex))
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='rt', description='Инструменты для работы с Redash через API. '
+                                                            'Результаты выводятся в формате JSON Lines.')
+    parser.add_argument('--url', help='url инстанса Redash (по умолчанию REDASH_URL или из профиля); '
+                                             'требует REDASH_API_KEY или явно выбранный профиль')
+    parser.add_argument('--profile', help='профиль из конфиг-файла (по умолчанию REDASH_PROFILE или default)')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    p = subparsers.add_parser('export', help='выгрузить запросы / дашборды в stdout')
+    p.add_argument('entity_type', choices=('query', 'dashboard'))
+    p.add_argument('ids', nargs='+', help='id запросов или slug дашбордов')
+    p.set_defaults(func=cmd_export)
+
+    p = subparsers.add_parser('import', help='загрузить запросы / дашборды из JSON Lines (результат export)')
+    p.add_argument('entity_type', choices=('query', 'dashboard'))
+    p.add_argument('files', nargs='*', help='файлы JSON Lines, по умолчанию stdin')
+    p.add_argument('--update', action='store_true',
+                   help='обновить существующие сущности вместо создания новых; сущности (включая запросы дашборда) '
+                        'сопоставляются по id, поэтому используйте только для файлов, выгруженных из того же инстанса')
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser('sync', help='перенести запросы / дашборды на другой инстанс (всегда создаёт новые)')
+    p.add_argument('entity_type', choices=('query', 'dashboard'))
+    p.add_argument('ids', nargs='+', help='id запросов или slug дашбордов')
+    p.add_argument('--target-url', help='url целевого инстанса')
+    p.add_argument('--target-profile', required=True, help='профиль целевого инстанса')
+    p.set_defaults(func=cmd_sync)
+
+    p = subparsers.add_parser('find', help='найти id сущностей по условиям')
+    p.add_argument('uri', help='тип сущностей, например queries, dashboards, users')
+    p.add_argument('--where', nargs='+', default=[], metavar='KEY=VALUE',
+                   help='условия отбора: key=value сравнивает со строкой, '
+                        'key:=json — со значением JSON (например id:=5, is_draft:=true)')
+    p.add_argument('--regex', action='store_true', help='сравнивать значения через re.search')
+    p.add_argument('--slugs', action='store_true', help='выводить slug вместо id')
+    p.set_defaults(func=cmd_find)
+
+    p = subparsers.add_parser('tag', help='проставить теги запросам')
+    p.add_argument('ids', nargs='+', type=int)
+    p.add_argument('--tags', nargs='+', required=True)
+    p.set_defaults(func=cmd_tag)
+
+    p = subparsers.add_parser('schedule', help='установить расписание запросам')
+    p.add_argument('ids', nargs='+', type=int)
+    p.add_argument('--interval', type=int, required=True, help='интервал в секундах')
+    p.set_defaults(func=cmd_schedule)
+
+    p = subparsers.add_parser('archive', help='заархивировать / восстановить запросы')
+    p.add_argument('ids', nargs='+', type=int)
+    p.add_argument('--restore', action='store_true', help='восстановить вместо архивирования')
+    p.set_defaults(func=cmd_archive)
+
+    p = subparsers.add_parser('replace-sql', help='автозамена в теле запросов')
+    p.add_argument('ids', nargs='+', type=int)
+    p.add_argument('--from', dest='str_from', required=True)
+    p.add_argument('--to', dest='str_to', required=True)
+    p.add_argument('--regex', action='store_true', help='использовать регулярное выражение')
+    p.set_defaults(func=cmd_replace_sql)
+
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # stdout reader has gone, redirect stdout so that interpreter doesn't fail flushing it at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        _write({'error': str(e) or repr(e)}, sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,2 +1,3 @@
 from redash_tools.core.session import RedashSession
-from redash_tools.core.entities import Query, Dashboard, Widget, Visualization, QueryTemplate, DashboardTemplate
\ No newline at end of file
+from redash_tools.core.entities import Query, Dashboard, Widget, Visualization, QueryTemplate, DashboardTemplate
+from redash_tools.core.cluster import RedashCluster, ClusterResult
@@ -0,0 +1,183 @@
+import logging
+import threading
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+
+from redash_tools.core.session import RedashSession
+
+logger = logging.getLogger(__name__)
+
+
+class ClusterResult:
+
+    def __init__(self):
+        """
+        per-instance results of RedashCluster operation
+        results and errors are dicts keyed by instance name
+        """
+        self.results = {}
+        self.errors = {}
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} ok={sorted(self.results)} errors={sorted(self.errors)}>'
+
+    @property
+    def ok(self):
+        return len(self.errors) == 0
+
+    def raise_for_errors(self):
+        """
+        raises UserWarning if operation failed on any instance
+        """
+        if len(self.errors) > 0:
+            raise UserWarning(f'Операция завершилась с ошибкой на инстансах {sorted(self.errors)}')
+        return self
+
+
+class RedashCluster:
+
+    def __init__(self, sessions, max_workers=8, per_instance=1):
+        """
+        initializes RedashCluster
+        sessions is dict {instance_name: RedashSession} or list of RedashSession (named by url)
+        max_workers limits concurrent calls in total, per_instance limits concurrent calls to one instance
+        """
+        if isinstance(sessions, dict):
+            self.sessions = dict(sessions)
+        else:
+            sessions = list(sessions)
+            self.sessions = {s.url: s for s in sessions}
+            if len(self.sessions) < len(sessions):
+                raise ValueError('Несколько сессий с одинаковым url, передайте сессии в виде словаря {имя: сессия}')
+        if max_workers < 1 or per_instance < 1:
+            raise ValueError('max_workers и per_instance должны быть положительными')
+        self.max_workers = max_workers
+        self.per_instance = per_instance
+        self._semaphores = {name: threading.BoundedSemaphore(per_instance) for name in self.sessions}
+
+    @classmethod
+    def from_credentials(cls, credentials: dict, **kwargs):
+        """
+        creates RedashCluster from dict {instance_name: (url, api_key)}
+        """
+        sessions = {name: RedashSession(url, api_key) for name, (url, api_key) in credentials.items()}
+        return cls(sessions, **kwargs)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {sorted(self.sessions)}>'
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __getitem__(self, name):
+        return self.sessions[name]
+
+    def _select(self, instances):
+        if instances is None:
+            return list(self.sessions)
+        unknown = set(instances) - set(self.sessions)
+        if len(unknown) > 0:
+            raise KeyError(f'Неизвестные инстансы: {sorted(unknown)}')
+        return list(instances)
+
+    def _call(self, name, func, args, kwargs):
+        with self._semaphores[name]:
+            return func(self.sessions[name], *args, **kwargs)
+
+    def _fan_out(self, tasks):
+        """
+        runs tasks [(instance_name, key, func, args, kwargs)] concurrently
+        returns list of (instance_name, key, result, exception)
+        """
+        if len(tasks) == 0:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = [(name, key, executor.submit(self._call, name, func, args, kwargs))
+                       for name, key, func, args, kwargs in tasks]
+            outcomes = []
+            try:
+                for name, key, future in futures:
+                    try:
+                        outcomes.append((name, key, future.result(), None))
+                    except Exception as e:
+                        logger.error(f'Ошибка на инстансе {name}: {e!r}')
+                        outcomes.append((name, key, None, e))
+            except BaseException:
+                # e.g. KeyboardInterrupt: don't send queued requests, executor waits only for running ones
+                # (shutdown(cancel_futures=True) requires python 3.9)
+                cancelled = sum(future.cancel() for _, _, future in futures)
+                logger.error(f'Операция прервана, отменено {cancelled} из {len(futures)} вызовов')
+                raise
+        return outcomes
+
+    ###########################
+    # fan-out methods section #
+    ###########################
+
+    def apply(self, func, *args, instances=None, **kwargs):
+        """
+        calls func(session, *args, **kwargs) on every instance concurrently
+        returns ClusterResult with func's return value or exception per instance
+        """
+        tasks = [(name, None, func, args, kwargs) for name in self._select(instances)]
+        cluster_result = ClusterResult()
+        for name, _, result, error in self._fan_out(tasks):
+            if error is None:
+                cluster_result.results[name] = result
+            else:
+                cluster_result.errors[name] = error
+        return cluster_result
+
+    def run(self, method: str, *args, instances=None, **kwargs):
+        """
+        calls RedashSession method with given name on every instance concurrently
+        e.g. cluster.run('tag_queries', [1, 2], ['prod'])
+        """
+        if not callable(getattr(RedashSession, method, None)):
+            raise AttributeError(f'RedashSession не имеет метода {method}')
+        return self.apply(lambda session, *a, **kw: getattr(session, method)(*a, **kw),
+                          *args, instances=instances, **kwargs)
+
+    def map(self, func, items, instances=None, **kwargs):
+        """
+        calls func(session, item, **kwargs) for every item on every instance
+        calls to one instance run concurrently up to per_instance limit
+        returns ClusterResult with list of results (None for failed items) per instance
+        and dict {item_index: exception} per instance with errors
+        """
+        items = list(items)
+        names = self._select(instances)
+        # interleave instances so that a slow instance doesn't hold all workers
+        tasks = [(name, i, func, (item,), kwargs) for i, item in enumerate(items) for name in names]
+        cluster_result = ClusterResult()
+        for name in names:
+            cluster_result.results[name] = [None] * len(items)
+        for name, i, result, error in self._fan_out(tasks):
+            if error is None:
+                cluster_result.results[name][i] = result
+            else:
+                cluster_result.errors.setdefault(name, {})[i] = error
+        return cluster_result
+
+    def to_redash(self, entities, instances=None, **kwargs):
+        """
+        uploads entity (Query / Dashboard) or list of entities to every instance
+        every instance gets its own copy, so given entities are not mutated
+        kwargs are passed to entity's to_redash (e.g. publish)
+        try_to_update is not supported: entity ids differ between instances,
+        so updating by id would overwrite unrelated entities
+        """
+        if kwargs.get('try_to_update'):
+            raise ValueError('try_to_update не поддерживается: id сущностей различаются на разных инстансах')
+        single = not isinstance(entities, (list, tuple))
+        entities = [entities] if single else list(entities)
+
+        def upload(session, entity):
+            return deepcopy(entity).to_redash(session, **kwargs)
+
+        cluster_result = self.map(upload, entities, instances=instances)
+        if single:
+            cluster_result.errors = {name: errors[0] for name, errors in cluster_result.errors.items()}
+            cluster_result.results = {name: results[0] for name, results in cluster_result.results.items()
+                                      if name not in cluster_result.errors}
+        return cluster_result
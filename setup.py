@@ -11,10 +11,11 @@ setup(name='redash_tools',
       download_url='https://github.com/pavlova-marina/redash-tools/archive/refs/tags/v1.0.3.tar.gz',
       keywords=['redash'],
       install_requires=['requests'],
-      python_requires='>=3.6',
+      python_requires='>=3.7',
+      entry_points={'console_scripts': ['rt=redash_tools.cli:main']},
       classifiers=[
                   'License :: OSI Approved :: MIT License',
                   'Operating System :: OS Independent',
-                  'Programming Language :: Python :: 3.6',
+                  'Programming Language :: Python :: 3.7',
               ]
       )
@@ -0,0 +1,94 @@
+import pytest
+
+from redash_tools.cli import _credentials, _parse_condition
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    path = tmp_path / 'redash_tools.ini'
+    path.write_text('[default]\n'
+                    'url = https://prod.example.com\n'
+                    'api_key = PRODKEY\n'
+                    '[stage]\n'
+                    'url = https://stage.example.com/\n'
+                    'api_key = STAGE%KEY\n', encoding='utf-8')
+    monkeypatch.setenv('REDASH_TOOLS_CONFIG', str(path))
+    for var in ('REDASH_URL', 'REDASH_API_KEY', 'REDASH_PROFILE'):
+        monkeypatch.delenv(var, raising=False)
+    return path
+
+
+def test_credentials_default_profile(config):
+    assert _credentials() == ('https://prod.example.com', 'PRODKEY')
+
+
+def test_credentials_explicit_profile(config):
+    assert _credentials(profile='stage') == ('https://stage.example.com', 'STAGE%KEY')
+
+
+def test_credentials_profile_from_env(config, monkeypatch):
+    monkeypatch.setenv('REDASH_PROFILE', 'stage')
+    assert _credentials() == ('https://stage.example.com', 'STAGE%KEY')
+
+
+def test_credentials_env_pair(config, monkeypatch):
+    monkeypatch.setenv('REDASH_URL', 'http://x')
+    monkeypatch.setenv('REDASH_API_KEY', 'ENVKEY')
+    assert _credentials() == ('http://x', 'ENVKEY')
+
+
+def test_credentials_explicit_profile_over_env(config, monkeypatch):
+    monkeypatch.setenv('REDASH_URL', 'http://x')
+    monkeypatch.setenv('REDASH_API_KEY', 'ENVKEY')
+    assert _credentials(profile='stage') == ('https://stage.example.com', 'STAGE%KEY')
+
+
+def test_credentials_env_url_without_key(config, monkeypatch):
+    monkeypatch.setenv('REDASH_URL', 'http://x')
+    with pytest.raises(SystemExit):
+        _credentials()
+
+
+def test_credentials_url_with_env_key(config, monkeypatch):
+    monkeypatch.setenv('REDASH_API_KEY', 'ENVKEY')
+    assert _credentials(url='http://other') == ('http://other', 'ENVKEY')
+
+
+def test_credentials_url_with_explicit_profile(config):
+    assert _credentials(url='http://other', profile='stage') == ('http://other', 'STAGE%KEY')
+
+
+def test_credentials_url_without_key(config):
+    with pytest.raises(SystemExit):
+        _credentials(url='http://other')
+
+
+def test_credentials_missing_profile(config):
+    with pytest.raises(SystemExit):
+        _credentials(profile='missing')
+
+
+@pytest.mark.parametrize('condition, expected', [
+    ('name=123', ('name', '123')),
+    ('name=true', ('name', 'true')),
+    ('name=a=b', ('name', 'a=b')),
+    ('id:=5', ('id', 5)),
+    ('is_draft:=true', ('is_draft', True)),
+    ('tags:=["a"]', ('tags', ['a'])),
+])
+def test_parse_condition(condition, expected):
+    assert _parse_condition(condition, regex=False) == expected
+
+
+def test_parse_condition_regex():
+    assert _parse_condition('name=^test.*', regex=True) == ('name', '^test.*')
+
+
+@pytest.mark.parametrize('condition, regex', [
+    ('name', False),
+    ('id:=5', True),
+    ('id:=not json', False),
+])
+def test_parse_condition_invalid(condition, regex):
+    with pytest.raises(SystemExit):
+        _parse_condition(condition, regex)